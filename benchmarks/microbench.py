@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from statistics import median
+
+from domain.board import Board
+from services.engine_loader import engine_loader, play_moves
+from services.game import Game
+
+# Fixed corpus: move sequences from the empty board (PLAYER first), none of them won yet
+POSITIONS = [
+    [],
+    [5, 0, 6, 5],
+    [4, 3, 6, 6],
+    [6, 4, 4, 4, 2, 3, 0, 4],
+    [2, 3, 6, 0, 0, 6, 1, 6],
+    [1, 6, 0, 4, 6, 2, 4, 5, 6, 4, 1, 2],
+    [3, 6, 5, 2, 1, 4, 5, 0, 3, 5, 0, 2],
+    [6, 3, 0, 2, 4, 3, 3, 6, 6, 2, 3, 2, 4, 1, 4, 1],
+]
+
+# A recorded hard-vs-impossible game; the game benchmark replays its first GAME_PLIES moves on one
+# persistent engine and searches every COMPUTER turn, like Game does
+GAME = [6, 6, 3, 4, 4, 3, 3, 4, 4, 3, 1, 0, 5, 4, 1, 1, 6, 6, 1, 1, 3, 3, 1, 5, 4, 5, 5, 5, 5, 0,
+        0, 0, 0, 0, 2, 2, 2, 2, 2, 2, 6, 6]
+GAME_PLIES = 30
+
+SEARCH_DEPTHS = [5, 7]
+DEEP_SEARCH_DEPTHS = [9]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def build_board(moves):
+    """
+    :return: The 6x7 board list after playing the moves (PLAYER first).
+    """
+    board = Board()
+    piece = Board.PLAYER
+    for col in moves:
+        board.place_piece(col, piece)
+        piece = -piece
+    return board.get_board()
+
+
+def build_engine(connect4_core, moves):
+    """
+    :return: A (Connect4Core, side to move) pair after playing the moves (PLAYER first).
+    """
+    engine = connect4_core.Connect4Core()
+    return engine, play_moves(engine, moves)
+
+
+def time_per_op(func, ops, repeat):
+    """
+    Times func (which performs `ops` operations) and keeps the median of `repeat` runs.
+
+    :return: Seconds per operation.
+    """
+    number, _ = timeit.Timer(func).autorange()
+    return median(timeit.repeat(func, number=number, repeat=repeat)) / (number * ops)
+
+
+def calibrate(repeat):
+    """
+    Times a fixed pure-Python loop. Timings are also stored relative to it, which takes out most of
+    the difference between machines (and between a busy and an idle run on the same machine).
+
+    :return: Seconds per calibration loop.
+    """
+    def loop():
+        total = 0
+        for i in range(1000):
+            total += i * i
+        return total
+
+    return time_per_op(loop, 1, repeat)
+
+
+def bench_domain(repeat):
+    board = Board()
+
+    def place_remove():
+        for col in range(7):
+            board.place_piece(col, Board.PLAYER)
+            board.remove_piece(col)
+
+    return {'board.place_piece+remove_piece': {'seconds_per_op': time_per_op(place_remove, 7, repeat)}}
+
+
+def bench_game(repeat):
+    boards = [build_board(moves) for moves in POSITIONS]
+    game = Game(difficulty='hard')
+    game.load_engine()
+
+    def set_board():
+        for board in boards:
+            game.set_board(board)
+
+    results = {'game.set_board': {'seconds_per_op': time_per_op(set_board, len(boards), repeat)}}
+
+    # Win checks from the top piece of every column of the fullest position
+    game.set_board(boards[-1])
+    tops = []
+    for col in range(7):
+        for row in range(6):
+            if boards[-1][row][col] != Board.EMPTY:
+                tops.append((boards[-1][row][col], row, col))
+                break
+
+    def check_winner():
+        for piece, row, col in tops:
+            game.check_winner(piece, row, col)
+
+    results['game.check_winner'] = {'seconds_per_op': time_per_op(check_winner, len(tops), repeat)}
+    results['game.is_full'] = {'seconds_per_op': time_per_op(game.is_full, 1, repeat)}
+    return results
+
+
+def bench_core(connect4_core, repeat, deep):
+    engine = connect4_core.Connect4Core()
+
+    def make_move():
+        for col in range(7):
+            for _ in range(6):
+                engine.make_move(col, Board.PLAYER)
+        engine.reset()
+
+    results = {'core.make_move': {'seconds_per_op': time_per_op(make_move, 42, repeat)}}
+
+    engine, _ = build_engine(connect4_core, POSITIONS[-1])
+
+    def check_winner():
+        engine.check_winner(Board.COMPUTER, 2, 3)
+
+    results['core.check_winner'] = {'seconds_per_op': time_per_op(check_winner, 1, repeat)}
+
+    for depth in SEARCH_DEPTHS + (DEEP_SEARCH_DEPTHS if deep else []):
+        nodes = []
+
+        def search():
+            # A fresh engine per position
+            nodes.clear()
+            for moves in POSITIONS:
+                engine, piece = build_engine(connect4_core, moves)
+                engine.get_best_move(depth, piece)
+                nodes.append(engine.nodes)
+
+        results[f'core.get_best_move[depth={depth}]'] = {
+            'seconds_per_op': time_per_op(search, len(POSITIONS), repeat),
+            'nodes': sum(nodes),
+        }
+
+        def play():
+            # One engine for the whole game: any state kept between moves is exercised
+            nodes.clear()
+            engine = connect4_core.Connect4Core()
+            piece = Board.PLAYER
+            for col in GAME[:GAME_PLIES]:
+                if piece == Board.COMPUTER:
+                    engine.get_best_move(depth, piece)
+                    nodes.append(engine.nodes)
+                engine.make_move(col, piece)
+                piece = -piece
+
+        results[f'core.get_best_move[game,depth={depth}]'] = {
+            'seconds_per_op': time_per_op(play, GAME_PLIES // 2, repeat),
+            'nodes': sum(nodes),
+        }
+    return results
+
+
+def run(repeat=7, deep=False):
+    """
+    Runs every benchmark.
+
+    :param repeat: Timing runs per benchmark; the median is kept.
+    :param deep: Also search at DEEP_SEARCH_DEPTHS (slow).
+    :return: A JSON-serializable dictionary of results.
+    """
+    connect4_core = engine_loader.get() or engine_loader.wait()
+    if connect4_core is None:
+        raise RuntimeError("The C++ engine could not be loaded.")
+
+    calibration = calibrate(repeat)
+    benchmarks = {}
+    benchmarks.update(bench_domain(repeat))
+    benchmarks.update(bench_game(repeat))
+    benchmarks.update(bench_core(connect4_core, repeat, deep))
+    for result in benchmarks.values():
+        result['relative'] = result['seconds_per_op'] / calibration
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        # Node counts are deterministic; timings are only meaningful on the machine that produced them
+        'timings': 'machine-specific',
+        'calibration_seconds': calibration,
+        'benchmarks': benchmarks,
+    }
+
+
+def compare(results, baseline, threshold, fail_on_timing=False):
+    """
+    Compares results with a baseline.
+    A search that visits more nodes than the baseline is a regression (node counts are deterministic).
+    A benchmark more than `threshold` (0.5 = 50%) slower than the baseline, measured relative to the
+    calibration loop, is a warning: timings vary between runs and machines.
+
+    :param fail_on_timing: Report slowdowns as regressions too (for a baseline made on the same machine).
+    :return: A (regressions, warnings) pair of lists of human-readable messages.
+    """
+    regressions = []
+    warnings = []
+    for name, base in baseline['benchmarks'].items():
+        current = results['benchmarks'].get(name)
+        if current is None:
+            continue
+        if 'nodes' in base and current.get('nodes', 0) > base['nodes']:
+            regressions.append(f"{name}: {current['nodes']} nodes (baseline {base['nodes']})")
+        if 'relative' in base and 'relative' in current:
+            ratio = current['relative'] / base['relative']
+            if ratio > 1 + threshold:
+                slowdowns = regressions if fail_on_timing else warnings
+                slowdowns.append(f"{name}: {ratio:.2f}x slower than baseline (calibrated)")
+    return regressions, warnings
+
+
+def print_results(results, baseline=None):
+    for name, result in results['benchmarks'].items():
+        line = f"{name:<36}{result['seconds_per_op'] * 1e6:12.3f} us/op"
+        if 'nodes' in result:
+            line += f"  {result['nodes']:>10} nodes"
+        base = baseline['benchmarks'].get(name) if baseline is not None else None
+        if base is not None and 'relative' in base:
+            line += f"  ({result['relative'] / base['relative']:.2f}x baseline)"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Connect4 engine and domain microbenchmarks.")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare with")
+    parser.add_argument('--threshold', type=float, default=0.5, help="slowdown that triggers a warning (0.5 = 50%%)")
+    parser.add_argument('--fail-on-timing', action='store_true',
+                        help="fail on slowdowns above the threshold, not only on node counts")
+    parser.add_argument('--update-baseline', action='store_true', help="overwrite the baseline with these results")
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--deep', action='store_true', help=f"also search at depth {DEEP_SEARCH_DEPTHS}")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.deep)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print_results(results)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+
+    if baseline is not None:
+        regressions, warnings = compare(results, baseline, args.threshold, args.fail_on_timing)
+        for message in warnings:
+            print(f"WARNING {message}")
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        # By default only node counts fail the run; timings are too noisy to gate on across machines
+        sys.exit(1 if regressions else 0)
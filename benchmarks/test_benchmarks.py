@@ -0,0 +1,47 @@
+from unittest import TestCase
+from benchmarks.microbench import compare
+
+
+class BenchmarksTest(TestCase):
+    def setUp(self):
+        self.__baseline = {'benchmarks': {
+            'game.is_full': {'seconds_per_op': 1.0, 'relative': 1.0},
+            'core.get_best_move[depth=5]': {'seconds_per_op': 1.0, 'relative': 1.0, 'nodes': 100},
+        }}
+
+    def test_compare_within_threshold(self):
+        results = {'benchmarks': {
+            'game.is_full': {'seconds_per_op': 1.1, 'relative': 1.4},
+            'core.get_best_move[depth=5]': {'seconds_per_op': 0.5, 'relative': 0.5, 'nodes': 90},
+        }}
+        self.assertEqual(compare(results, self.__baseline, 0.5), ([], []))
+
+    def test_compare_slowdown_is_warning(self):
+        """Timings are noisy, so a slowdown only warns."""
+        results = {'benchmarks': {
+            'game.is_full': {'seconds_per_op': 2.0, 'relative': 2.0},
+            'core.get_best_move[depth=5]': {'seconds_per_op': 1.0, 'relative': 1.0, 'nodes': 100},
+        }}
+        regressions, warnings = compare(results, self.__baseline, 0.5)
+        self.assertEqual(regressions, [])
+        self.assertEqual(len(warnings), 1)
+        self.assertTrue(warnings[0].startswith('game.is_full'))
+
+    def test_compare_fail_on_timing(self):
+        """In strict mode a calibrated slowdown above the threshold is a regression."""
+        results = {'benchmarks': {
+            'game.is_full': {'seconds_per_op': 2.0, 'relative': 2.0},
+            'core.get_best_move[depth=5]': {'seconds_per_op': 1.0, 'relative': 1.2, 'nodes': 100},
+        }}
+        regressions, warnings = compare(results, self.__baseline, 0.5, fail_on_timing=True)
+        self.assertEqual(warnings, [])
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('game.is_full'))
+
+    def test_compare_more_nodes(self):
+        """Node counts are deterministic, so any increase is a regression."""
+        results = {'benchmarks': {
+            'core.get_best_move[depth=5]': {'seconds_per_op': 1.0, 'relative': 1.0, 'nodes': 101},
+        }}
+        regressions, warnings = compare(results, self.__baseline, 0.5)
+        self.assertEqual(len(regressions), 1)
@@ -2,20 +2,34 @@
 #include <vector>
 #include <algorithm>
 #include <cmath>
+#include <cstdint>
 #include <iostream>
+#include <memory>
+#include <stdexcept>
+#include <string>
+#include <unordered_map>
 
 namespace py = pybind11;
 
+// Passed in by setup.py
+#ifndef CONNECT4_CORE_VERSION
+#define CONNECT4_CORE_VERSION "unknown"
+#endif
+
 constexpr int EMPTY = 0;
 constexpr int PLAYER = 1;
 constexpr int COMPUTER = -1;
 constexpr int ROWS = 6;
 constexpr int COLS = 7;
+constexpr int WIN_SCORE = 1000000;
+constexpr int INF_SCORE = 1000000000;
+constexpr uint64_t COMPUTER_TO_MOVE = 1ULL << 49;
 
 class Connect4Core
 {
 public:
     int board[ROWS][COLS] = {};
+    int pieces = 0;
 
     Connect4Core()
     {
@@ -27,6 +41,7 @@ public:
         for (auto& r : board)
             for (int& c : r)
                 c = EMPTY;
+        pieces = 0;
     }
 
     int make_move(const int col, const int piece)
@@ -36,6 +51,7 @@ public:
             if (board[row][col] == EMPTY)
             {
                 board[row][col] = piece;
+                pieces++;
                 return row;
             }
         return -1;
@@ -44,6 +60,149 @@ public:
     void remove_piece(const int row, const int col)
     {
         board[row][col] = EMPTY;
+        pieces--;
+    }
+
+    int empty_cells() const
+    {
+        return ROWS * COLS - pieces;
+    }
+
+    uint64_t position_key(const int piece) const
+    // Unique 50-bit key: 7 bits per column holding the COMPUTER stones plus a sentinel bit
+    // above the top stone, and bit 49 set when COMPUTER is the side to move
+    {
+        uint64_t key = (piece == COMPUTER) ? COMPUTER_TO_MOVE : 0;
+        for (int c = 0; c < COLS; c++)
+        {
+            int height = 0;
+            for (int row = ROWS - 1; row >= 0 && board[row][c] != EMPTY; row--)
+            {
+                if (board[row][c] == COMPUTER)
+                    key |= 1ULL << (c * 7 + height);
+                height++;
+            }
+            key |= 1ULL << (c * 7 + height);
+        }
+        return key;
+    }
+
+    bool has_winner() const
+    // Scans the whole board for a four-in-a-row of either piece
+    {
+        for (int r = 0; r < ROWS; r++)
+            for (int c = 0; c < COLS; c++)
+                if (board[r][c] != EMPTY && check_winner(board[r][c], r, c))
+                    return true;
+        return false;
+    }
+
+    // --- Endgame Tablebase ---
+
+    // Records are sorted uint64 values: (position_key << 8) | (uint8_t)result, where result is
+    // +m / -m when COMPUTER / PLAYER wins in m plies with perfect play and 0 for a draw.
+    // They are stored compressed in blocks of tb_block_records: a block index of TablebaseBlock
+    // entries, then per block the differences between consecutive records as LEB128 varints.
+    // A probe binary-searches the index and decodes a single block, straight from the buffer.
+    // The buffer_info keeps the buffer export alive, so the file cannot be unmapped
+    // (mmap.close() raises BufferError) while an engine is attached
+    struct TablebaseBlock
+    {
+        uint64_t first;   // first record of the block, stored in full
+        uint64_t offset;  // byte offset of the block's varints in the data section
+    };
+
+    std::unique_ptr<py::buffer_info> tablebase;
+    const TablebaseBlock* tb_index = nullptr;
+    size_t tb_blocks = 0;
+    const uint8_t* tb_data = nullptr;
+    const uint8_t* tb_data_end = nullptr;
+    size_t tb_count = 0;
+    size_t tb_block_records = 0;
+    int tb_max_empty = -1;
+
+    void set_tablebase(const py::buffer& buffer, const size_t count, const size_t block_records,
+                       const int max_empty)
+    // buffer holds the block index followed by the data section (see TablebaseBuilder::encode)
+    {
+        if (block_records == 0)
+            throw std::invalid_argument("block_records must be positive.");
+        auto info = std::make_unique<py::buffer_info>(buffer.request());
+        const size_t bytes = static_cast<size_t>(info->size * info->itemsize);
+        const size_t blocks = (count + block_records - 1) / block_records;
+        if (bytes < blocks * sizeof(TablebaseBlock))
+            throw std::invalid_argument("Tablebase buffer is too small for its block index.");
+
+        tablebase = std::move(info);
+        const auto* base = static_cast<const uint8_t*>(tablebase->ptr);
+        tb_index = reinterpret_cast<const TablebaseBlock*>(base);
+        tb_blocks = blocks;
+        tb_data = base + blocks * sizeof(TablebaseBlock);
+        tb_data_end = base + bytes;
+        tb_count = count;
+        tb_block_records = block_records;
+        tb_max_empty = max_empty;
+    }
+
+    void clear_tablebase()
+    {
+        tablebase.reset();
+        tb_index = nullptr;
+        tb_blocks = 0;
+        tb_data = tb_data_end = nullptr;
+        tb_count = 0;
+        tb_max_empty = -1;
+    }
+
+    bool probe_tablebase(const int piece, int& result) const
+    // piece is the side to move in the current position
+    {
+        if (tb_count == 0 || empty_cells() > tb_max_empty)
+            return false;
+        const uint64_t key = position_key(piece);
+        // Last block whose first record is <= key
+        const TablebaseBlock* block = std::upper_bound(
+            tb_index, tb_index + tb_blocks, key,
+            [](const uint64_t k, const TablebaseBlock& b) { return k < (b.first >> 8); });
+        if (block == tb_index)
+            return false;
+        --block;
+
+        const size_t b = static_cast<size_t>(block - tb_index);
+        const size_t in_block = std::min(tb_block_records, tb_count - b * tb_block_records);
+        const uint8_t* p = tb_data + block->offset;
+        uint64_t record = block->first;
+        for (size_t i = 0;; i++)
+        {
+            if ((record >> 8) >= key)
+                break;
+            if (i + 1 == in_block)
+                return false;
+            uint64_t delta = 0;
+            for (int shift = 0;; shift += 7)
+            {
+                if (p == tb_data_end)
+                    return false;
+                const uint8_t byte = *p++;
+                delta |= static_cast<uint64_t>(byte & 0x7F) << shift;
+                if (!(byte & 0x80))
+                    break;
+            }
+            record += delta;
+        }
+        if ((record >> 8) != key)
+            return false;
+        result = static_cast<int8_t>(record & 0xFF);
+        return true;
+    }
+
+    std::pair<int, int> lookup_tablebase(const int piece) const
+    // Python-facing probe: (found, result)
+    {
+        int result = 0;
+        if (!probe_tablebase(piece, result))
+            return {0, 0};
+        return {1, result};
     }
 
     bool check_winner(const int piece, const int last_row, const int last_col) const
@@ -81,6 +240,105 @@ public:
         return false;
     }
 
+    // --- Exact Endgame Solver ---
+
+    // Positions solved on demand (same result encoding as the tablebase), kept across moves
+    std::unordered_map<uint64_t, int8_t> endgame_results;
+    int endgame_max_empty = -1;
+
+    void set_endgame_solver(const int max_empty)
+    // Positions with at most max_empty empty cells are solved exactly instead of searched (-1 disables)
+    {
+        endgame_max_empty = max_empty;
+    }
+
+    static int rank(const int result, const int piece)
+    // Preference of a result for the side to move: quick wins > slow wins > draws > slow losses > quick losses
+    {
+        const int own = (piece == COMPUTER) ? result : -result;
+        if (own > 0) return 100 - own;
+        if (own < 0) return -100 - own;
+        return 0;
+    }
+
+    int solve_exact(const int piece, std::unordered_map<uint64_t, int8_t>& results)
+    // Exhaustive minimax (no depth limit); every position is solved once, its children first.
+    // The attached tablebase, if any, answers positions it contains without solving them.
+    {
+        int result;
+        if (probe_tablebase(piece, result))
+            return result;
+        const uint64_t key = position_key(piece);
+        const auto found = results.find(key);
+        if (found != results.end())
+            return found->second;
+
+        int best = 0;
+        bool has_move = false;
+        bool won = false;
+        for (int col = 0; col < COLS && !won; col++)
+        {
+            if (board[0][col] != EMPTY) continue;
+            const int row = make_move(col, piece);
+            if (check_winner(piece, row, col))
+            {
+                best = (piece == COMPUTER) ? 1 : -1;
+                won = true;
+            }
+            remove_piece(row, col);
+        }
+
+        for (int col = 0; col < COLS && !won; col++)
+        {
+            if (board[0][col] != EMPTY) continue;
+            const int row = make_move(col, piece);
+            result = solve_exact(-piece, results);
+            remove_piece(row, col);
+            // One ply further away from the end
+            if (result > 0) result++;
+            else if (result < 0) result--;
+            if (!has_move || rank(result, piece) > rank(best, piece))
+                best = result;
+            has_move = true;
+        }
+
+        // Full board without a winner is a draw (best stays 0)
+        results[key] = static_cast<int8_t>(best);
+        return best;
+    }
+
+    std::pair<int, int> solve_best_move(const int depth, const int piece)
+    // Perfect move for piece; the score uses the search convention (a win at the root scores WIN_SCORE + depth)
+    {
+        const size_t known = endgame_results.size();
+        int best = 0;
+        int best_col = -1;
+        for (int col : {3, 2, 4, 1, 5, 0, 6})
+        {
+            if (board[0][col] != EMPTY) continue;
+            const int row = make_move(col, piece);
+            int result;
+            if (check_winner(piece, row, col))
+                result = (piece == COMPUTER) ? 1 : -1;
+            else
+            {
+                result = solve_exact(-piece, endgame_results);
+                if (result > 0) result++;
+                else if (result < 0) result--;
+            }
+            remove_piece(row, col);
+            if (best_col == -1 || rank(result, piece) > rank(best, piece))
+            {
+                best = result;
+                best_col = col;
+            }
+        }
+        nodes = static_cast<long long>(endgame_results.size() - known);
+        if (best > 0) return {WIN_SCORE + depth + 1 - best, best_col};
+        if (best < 0) return {-WIN_SCORE - depth - 1 - best, best_col};
+        return {0, best_col};
+    }
+
     // --- Minimax Logic ---
 
     int score_window(const int r, const int c, const int dr, const int dc) const
@@ -161,8 +419,14 @@ public:
         return score;
     }
 
-    std::pair<int, int> get_best_move(const int depth, int alpha, int beta, const int piece)
+    // --- Negamax with Principal Variation Search ---
+
+    long long nodes = 0; // nodes visited by the last get_best_move call
+
+    int negamax(const int depth, int alpha, const int beta, const int piece, int& best_col)
+    // Returns the score from the perspective of piece (the side to move)
     {
+        nodes++;
         std::vector<int> valid_moves;
         for (int c = 0; c < COLS; c++)
         {
@@ -174,9 +438,13 @@ public:
         {
             return abs(a - 3) < abs(b - 3);
         });
-        int best_col = -1;
-        int best_score = (piece == COMPUTER) ? -2000000 : 200000;
-        if (valid_moves.empty()) return {0, -1};
+        best_col = -1;
+        if (valid_moves.empty()) return 0;
+
+        const int color = (piece == COMPUTER) ? 1 : -1;
+        int best_score = -2000000;
+        bool first = true;
+        int child_col;
 
         for (int col : valid_moves)
         {
@@ -186,57 +454,147 @@ public:
             if (check_winner(piece, row, col))
             {
                 remove_piece(row, col);
+                best_col = col;
                 // prioritize winning sooner (add depth to score) and losing later (subtract depth from score)
-                return {(piece == COMPUTER) ? 1000000 + depth : -1000000 - depth, col};
+                return WIN_SCORE + depth;
             }
 
             int score;
-            if (depth == 0)
+            int result;
+            if (probe_tablebase(-piece, result))
             {
-                score = evaluate_board();
+                // Exact endgame result: scored like a search win found result plies below this node
+                if (result > 0) score = WIN_SCORE + depth - result;
+                else if (result < 0) score = -WIN_SCORE - depth - result;
+                else score = 0;
+                score *= color;
             }
-            else
+            else if (depth == 0)
             {
-                score = get_best_move(depth - 1, alpha, beta, -piece).first;
+                score = color * evaluate_board();
             }
-            remove_piece(row, col);
-            if (piece == COMPUTER)
+            else if (first)
             {
-                if (score > best_score)
-                {
-                    best_score = score;
-                    best_col = col;
-                }
-                alpha = std::max(alpha, best_score);
+                // Principal variation: full window
+                score = -negamax(depth - 1, -beta, -alpha, -piece, child_col);
             }
             else
             {
-                if (score < best_score)
-                {
-                    best_score = score;
-                    best_col = col;
-                }
-                beta = std::min(beta, best_score);
+                // Null-window scout; re-search only if the move may beat the principal variation
+                score = -negamax(depth - 1, -alpha - 1, -alpha, -piece, child_col);
+                if (score > alpha && score < beta)
+                    score = -negamax(depth - 1, -beta, -alpha, -piece, child_col);
             }
-            if (beta <= alpha)
+            remove_piece(row, col);
+            first = false;
+
+            if (score > best_score)
+            {
+                best_score = score;
+                best_col = col;
+            }
+            alpha = std::max(alpha, best_score);
+            if (alpha >= beta)
                 break; // Alpha-Beta Pruning
         }
-        if (best_col == -1 && !valid_moves.empty())
-            best_col = valid_moves[0];
-        return {best_score, best_col};
+        return best_score;
+    }
+
+    std::pair<int, int> get_best_move(const int depth, const int piece)
+    // Compatibility wrapper: returns (score from COMPUTER's perspective, column), like the old minimax.
+    // Searches with the full window: aspiration windows around the previous move's score were
+    // measured to visit more nodes in play (the -80 threat term makes them fail too often).
+    {
+        if (empty_cells() > 0 && empty_cells() <= endgame_max_empty)
+            return solve_best_move(depth, piece);
+
+        const int color = (piece == COMPUTER) ? 1 : -1;
+        nodes = 0;
+        int best_col = -1;
+        const int score = negamax(depth, -INF_SCORE, INF_SCORE, piece, best_col);
+        return {color * score, best_col};
+    }
+};
+
+class TablebaseBuilder
+{
+public:
+    std::unordered_map<uint64_t, int8_t> results;
+
+    int add_root(Connect4Core& core, const int piece, const int max_empty)
+    // Solves every position reachable from the core's current position (piece to move).
+    // Returns the result of the root, or raises if the root has more than max_empty empty cells
+    // or is already won (its stored result would be wrong).
+    {
+        if (core.empty_cells() > max_empty)
+            throw std::invalid_argument("Root position has more than max_empty empty cells.");
+        if (core.has_winner())
+            throw std::invalid_argument("Root position already has a winner.");
+        return core.solve_exact(piece, results);
+    }
+
+    size_t size() const
+    {
+        return results.size();
+    }
+
+    py::bytes encode(const size_t block_records) const
+    // The compressed tablebase (block index, then the data section) read by set_tablebase
+    {
+        if (block_records == 0)
+            throw std::invalid_argument("block_records must be positive.");
+        std::vector<uint64_t> packed;
+        packed.reserve(results.size());
+        for (const auto& [key, result] : results)
+            packed.push_back((key << 8) | static_cast<uint8_t>(result));
+        std::sort(packed.begin(), packed.end());
+
+        std::vector<Connect4Core::TablebaseBlock> index;
+        std::string data;
+        for (size_t i = 0; i < packed.size(); i++)
+        {
+            if (i % block_records == 0)
+            {
+                index.push_back({packed[i], data.size()});
+                continue;
+            }
+            uint64_t delta = packed[i] - packed[i - 1];
+            while (delta >= 0x80)
+            {
+                data.push_back(static_cast<char>((delta & 0x7F) | 0x80));
+                delta >>= 7;
+            }
+            data.push_back(static_cast<char>(delta));
+        }
+
+        std::string encoded(reinterpret_cast<const char*>(index.data()),
+                            index.size() * sizeof(Connect4Core::TablebaseBlock));
+        encoded += data;
+        return encoded;
     }
 };
 
 PYBIND11_MODULE(connect4_core, m)
 {
+    // Checked by EngineLoader, so an engine built from older sources is reinstalled instead of used
+    m.attr("__version__") = CONNECT4_CORE_VERSION;
+
     py::class_<Connect4Core>(m, "Connect4Core")
         .def(py::init<>())
         .def("make_move", &Connect4Core::make_move)
         .def("check_winner", &Connect4Core::check_winner)
         .def("reset", &Connect4Core::reset)
-        // Wrapper: Automatically handles Alpha/Beta infinities for Python
-        .def("get_best_move", [](Connect4Core& self, int depth, int piece)
-        {
-            return self.get_best_move(depth, -1000000000, 1000000000, piece);
-        });
+        .def("set_tablebase", &Connect4Core::set_tablebase)
+        .def("clear_tablebase", &Connect4Core::clear_tablebase)
+        .def("lookup_tablebase", &Connect4Core::lookup_tablebase)
+        .def("set_endgame_solver", &Connect4Core::set_endgame_solver)
+        // The GIL is released so searches of concurrent sessions run in parallel
+        .def("get_best_move", &Connect4Core::get_best_move, py::call_guard<py::gil_scoped_release>())
+        .def_readonly("nodes", &Connect4Core::nodes);
+
+    py::class_<TablebaseBuilder>(m, "TablebaseBuilder")
+        .def(py::init<>())
+        .def("add_root", &TablebaseBuilder::add_root)
+        .def("size", &TablebaseBuilder::size)
+        .def("encode", &TablebaseBuilder::encode);
 }
@@ -0,0 +1,197 @@
+import importlib
+import importlib.metadata
+import os
+import subprocess
+import sys
+import threading
+
+from domain.board import Board
+
+# Version of the engine sources (setup.py); an installed engine with any other version is outdated
+ENGINE_VERSION = '1.0.0'
+
+
+class EngineLoader:
+    """
+    Lazily imports the C++ engine (connect4_core).
+    The first request tries a plain import; if the module is missing or outdated (built from older
+    sources, without the current API), the wheel/compile installation runs on a background thread
+    so the caller (and the GUI) never blocks on pip.
+    """
+
+    UNLOADED = 'unloaded'
+    LOADING = 'loading'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, installer=None):
+        """
+        :param installer: Callable used to install the engine when the import fails.
+                          Defaults to install_cpp_engine.
+        """
+        self.__installer = installer if installer is not None else install_cpp_engine
+        self.__module = None
+        self.__status = self.UNLOADED
+        self.__thread = None
+        self.__lock = threading.Lock()
+
+    def get(self):
+        """
+        Returns the connect4_core module if it is available, None otherwise.
+        A missing engine starts a background installation on the first call.
+
+        :return: The imported module, or None while the engine is loading (or failed to load).
+        """
+        if self.__module is not None:
+            return self.__module
+
+        with self.__lock:
+            if self.__status != self.UNLOADED:
+                return self.__module
+            frozen = getattr(sys, 'frozen', False)
+            installed = None if frozen else installed_engine_version()
+            if installed not in (None, ENGINE_VERSION):
+                # Checked before importing: an imported extension cannot be replaced in this process
+                print(f"C++ Engine {installed} is outdated (expected {ENGINE_VERSION}).")
+            else:
+                try:
+                    # A plain import statement (not importlib) so PyInstaller's analysis bundles the extension
+                    import connect4_core
+                    if getattr(connect4_core, '__version__', None) == ENGINE_VERSION:
+                        self.__module = connect4_core
+                        self.__status = self.READY
+                        return self.__module
+                    print(f"C++ Engine is outdated (expected {ENGINE_VERSION}).")
+                except ImportError:
+                    pass
+                if frozen:
+                    # PyInstaller bundles the engine; pip is not an option in an .exe.
+                    print("C++ Engine missing or outdated in the frozen build.")
+                    self.__status = self.FAILED
+                    return None
+
+            self.__status = self.LOADING
+            self.__thread = threading.Thread(target=self.__install, daemon=True)
+            self.__thread.start()
+            return None
+
+    def wait(self, timeout=None):
+        """
+        Blocks until a background installation finishes (used by tests and scripts, never by the GUI).
+
+        :param timeout: Maximum number of seconds to wait.
+        :return: The imported module, or None if the engine is still unavailable.
+        """
+        thread = self.__thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.__module
+
+    def get_status(self):
+        return self.__status
+
+    def __install(self):
+        """
+        Runs the installer and imports the freshly installed module (background thread).
+        """
+        module = None
+        if self.__installer():
+            importlib.invalidate_caches()
+            try:
+                import connect4_core
+                if getattr(connect4_core, '__version__', None) == ENGINE_VERSION:
+                    module = connect4_core
+                else:
+                    # The outdated module was imported before the update and stays loaded
+                    print("C++ Engine updated; restart the game to use it.")
+            except ImportError:
+                print("C++ Engine installed but could not be imported.")
+
+        with self.__lock:
+            self.__module = module
+            self.__status = self.READY if module is not None else self.FAILED
+
+
+def installed_engine_version():
+    """
+    Reads the installed engine's version from the package metadata, without importing it.
+
+    :return: The version string, or None if connect4_core is not installed with pip.
+    """
+    try:
+        return importlib.metadata.version("connect4_core")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def install_cpp_engine():
+    """
+    Installs the connect4_core C++ engine.
+    1. Tries to install a pre-compiled wheel from the 'wheels' folder (Fast/Windows).
+    2. If that fails (or the wheel is outdated), attempts to compile from source (Mac/Linux).
+
+    :return: True if one of the attempts succeeded, False otherwise.
+    """
+    print("C++ Engine for Connect4 not found or outdated...")
+
+    # The project root is one level up from 'services/'
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    wheel_dir = os.path.join(base_dir, 'wheels')
+
+    # --- ATTEMPT 1: Install Pre-Compiled Wheel (Priority) ---
+    try:
+        if os.path.exists(wheel_dir):
+            print("Attempting to install pre-compiled wheel...")
+            subprocess.check_call([
+                sys.executable, "-m", "pip", "install",
+                "connect4_core",
+                "--no-index",
+                "--force-reinstall",
+                f"--find-links={wheel_dir}"
+            ])
+            importlib.invalidate_caches()
+            if installed_engine_version() == ENGINE_VERSION:
+                print("Installation complete!")
+                return True
+            print("Pre-compiled wheel is outdated.")
+        else:
+            print(f"Warning: 'wheels' folder not found at: {wheel_dir}")
+
+    except subprocess.CalledProcessError:
+        print("Pre-compiled wheel not compatible or not found for this OS.")
+
+    # --- ATTEMPT 2: Compile from Source (Fallback) ---
+    print("Attempting to compile from source (This may take a moment)...")
+
+    try:
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install", "."
+        ], cwd=base_dir)
+        print("Engine compiled and installed successfully!")
+        return True
+
+    except subprocess.CalledProcessError:
+        print("\nCRITICAL ERROR: Could not install the C++ engine.")
+        print("1. If you are on Windows, ensure the 'wheels' folder is present.")
+        print("2. If you are on Mac/Linux, ensure you have a C++ compiler installed (Xcode/g++).")
+        print("Easy and Medium difficulties remain playable.")
+        return False
+
+
+def play_moves(engine, moves, piece=Board.PLAYER):
+    """
+    Plays a sequence of moves on a Connect4Core, alternating sides.
+
+    :param engine: The C++ engine to play on.
+    :param moves: Column indices.
+    :param piece: The side that plays the first move.
+    :return: The side to move after the sequence.
+    """
+    for col in moves:
+        engine.make_move(col, piece)
+        piece = -piece
+    return piece
+
+
+# Shared loader: every Game in the process uses the same engine import
+engine_loader = EngineLoader()
@@ -1,8 +1,9 @@
 from random import choice
-import connect4_core
 
 from domain.board import Board
-from exceptions import InvalidMove
+from services.engine_loader import engine_loader
+from services.search_scheduler import SearchScheduler
+from services.threats import ThreatTracker
 
 
 class Game:
@@ -11,16 +12,29 @@ class Game:
     Handles turn management, move validation, win detection, and the AI opponent.
     """
 
-    def __init__(self, difficulty='hard'):
+    # At the impossible level, positions with at most this many empty cells are solved exactly (a few ms)
+    ENDGAME_EMPTY = 14
+
+    def __init__(self, difficulty='hard', loader=None, tablebase=None, scheduler=None, priority=None):
         """
         Initializes the game with a board, players, and difficulty level.
 
         :param difficulty: The initial difficulty level for the AI ('easy', 'medium', 'hard', 'impossible').
                            Defaults to 'hard' if an invalid value is provided.
+        :param loader: EngineLoader used to import the C++ engine. Defaults to the shared engine_loader.
+        :param tablebase: Optional endgame Tablebase consulted by the C++ engine before searching.
+        :param scheduler: Optional SearchScheduler shared by all sessions; it may lower the search depth under load.
+        :param priority: This session's SearchScheduler priority. Defaults to SearchScheduler.NORMAL.
         """
         self.__board = Board()
-        # Initialize C++ core
-        self.__cpp_engine = connect4_core.Connect4Core()
+        # Four-in-a-row window counts and threat cells, used by the medium AI and win detection
+        self.__threats = ThreatTracker()
+        # C++ core is created lazily on the first AI move that needs it
+        self.__loader = loader if loader is not None else engine_loader
+        self.__cpp_engine = None
+        self.__tablebase = tablebase
+        self.__scheduler = scheduler
+        self.__priority = priority if priority is not None else SearchScheduler.NORMAL
         # Constants for player representation (using Board constants)
         self.PLAYER_KEY = Board.PLAYER  # 1 (red)
         self.COMPUTER_KEY = Board.COMPUTER  # -1 (yellow)
@@ -43,7 +57,7 @@ class Game:
         """
         Checks if the last move created a winning condition (4 in a row).
         Optimized to check only around the last placed piece.
-        This function is kept for the medium AI logic, as the hard AI uses the C++ engine.
+        Moves made through the game are checked with the threat tables instead; this remains a standalone check.
 
         :param piece: The piece value that was just placed (1 for player, -1 for AI).
         :param last_row: The row index of the last placed piece.
@@ -105,8 +119,7 @@ class Game:
         :raises InvalidMove: If the move is invalid (e.g., column full or out of bounds).
         """
         row = self.__board.place_piece(column, self.__current_player)
-        self.__cpp_engine.make_move(column, self.__current_player)
-        if self.__cpp_engine.check_winner(self.__current_player, row, column):
+        if self.__record_move(row, column):
             return True
         self.__switch_player()
         return False
@@ -119,7 +132,8 @@ class Game:
         """
         if self.__difficulty == 'easy':
             col = self.__get_easy_move()
-        elif self.__difficulty == 'medium':
+        elif self.__difficulty == 'medium' or self.__get_engine() is None:
+            # Until the C++ engine is ready, hard/impossible play the medium strategy
             col = self.__get_medium_move()
         elif self.__difficulty == 'hard':
             col = self.__get_hard_move()
@@ -129,13 +143,65 @@ class Game:
         row = self.__board.place_piece(col, self.__current_player)
         self.__last_move = (row, col)
 
-        self.__cpp_engine.make_move(col, self.__current_player)
-
-        if self.__cpp_engine.check_winner(self.__current_player, row, col):
+        if self.__record_move(row, col):
             return True
         self.__switch_player()
         return False
 
+    def is_engine_ready(self):
+        """
+        Checks whether the C++ engine has been loaded for this game.
+
+        :return: True if hard/impossible moves are computed by the C++ engine, False otherwise.
+        """
+        return self.__cpp_engine is not None
+
+    def load_engine(self):
+        """
+        Loads the C++ engine now instead of on the first AI move that needs it.
+
+        :return: True if the engine is ready, False while it is still being installed.
+        """
+        return self.__get_engine() is not None
+
+    def __get_engine(self):
+        """
+        Returns the C++ engine, creating it on first use and syncing it with the current board.
+
+        :return: The Connect4Core instance, or None while the engine is not available.
+        """
+        if self.__cpp_engine is None:
+            module = self.__loader.get()
+            if module is None:
+                return None
+            self.__cpp_engine = module.Connect4Core()
+            if self.__tablebase is not None:
+                self.__tablebase.attach(self.__cpp_engine)
+            self.__sync_engine()
+        return self.__cpp_engine
+
+    def __sync_engine(self):
+        """
+        Rebuilds the C++ engine state from the Python board (bottom row first).
+        """
+        board = self.__board.get_board()
+        self.__cpp_engine.reset()
+        for r in range(5, -1, -1):
+            for c in range(7):
+                piece = board[r][c]
+                if piece != Board.EMPTY:
+                    self.__cpp_engine.make_move(c, piece)
+
+    def __record_move(self, row, col):
+        """
+        Mirrors a placed piece into the threat tables and the C++ engine (if loaded).
+
+        :return: True if the move resulted in a win, False otherwise.
+        """
+        if self.__cpp_engine is not None:
+            self.__cpp_engine.make_move(col, self.__current_player)
+        return self.__threats.add(row, col, self.__current_player)
+
     # --- AI Move Strategies ---
 
     def __get_easy_move(self):
@@ -158,28 +224,12 @@ class Game:
 
         :return: A valid column index for the AI's move.
         """
-        # 1. Try to win
-        for col in range(7):
-            try:
-                row = self.__board.place_piece(col, self.__current_player)
-                if self.check_winner(self.__current_player, row, col):
-                    self.__board.remove_piece(col)
-                    return col
-                self.__board.remove_piece(col)
-            except InvalidMove:
-                continue
-
-        # 2. Block opponent
-        opponent = self.PLAYER_KEY
-        for col in range(7):
-            try:
-                row = self.__board.place_piece(col, opponent)
-                if self.check_winner(opponent, row, col):
-                    self.__board.remove_piece(col)
-                    return col
-                self.__board.remove_piece(col)
-            except InvalidMove:
-                continue
+        # Both are lookups in the threat tables kept up to date by every move
+        col = self.__threats.winning_column(self.__current_player)
+        if col is None:
+            col = self.__threats.winning_column(self.PLAYER_KEY)
+        if col is not None:
+            return col
 
         return self.__get_easy_move()
 
@@ -189,9 +239,7 @@ class Game:
 
         :return: A valid column index for the AI's move.
         """
-        # Calling C++ engine's minimax function
-        score, col = self.__cpp_engine.get_best_move(5, self.COMPUTER_KEY)
-        return col
+        return self.__get_engine_move(5)
 
     def __get_impossible_move(self):
         """
@@ -199,8 +247,23 @@ class Game:
 
         :return: A valid column index for the AI's move.
         """
-        # Calling C++ engine's minimax function
-        score, col = self.__cpp_engine.get_best_move(9, self.COMPUTER_KEY)
+        return self.__get_engine_move(9)
+
+    def __get_engine_move(self, depth):
+        """
+        Runs the C++ engine's minimax, at a lower depth if the scheduler reports overload.
+
+        :param depth: The depth of the current difficulty level.
+        :return: A valid column index for the AI's move.
+        """
+        # Set on every move: the difficulty can change mid-game, and hard must stay depth-limited
+        self.__cpp_engine.set_endgame_solver(self.ENDGAME_EMPTY if self.__difficulty == 'impossible' else -1)
+        if self.__scheduler is None:
+            score, col = self.__cpp_engine.get_best_move(depth, self.COMPUTER_KEY)
+            return col
+
+        with self.__scheduler.search(depth, self.__priority) as granted:
+            score, col = self.__cpp_engine.get_best_move(granted, self.COMPUTER_KEY)
         return col
 
     def __switch_player(self):
@@ -222,13 +285,10 @@ class Game:
 
     def set_board(self, new_board):
         self.__board.set_board(new_board)
-        self.__cpp_engine.reset()
+        self.__threats.rebuild(new_board)
         # Rebuild C++ engine state
-        for r in range(5, -1, -1):
-            for c in range(7):
-                piece = new_board[r][c]
-                if piece != Board.EMPTY:
-                    self.__cpp_engine.make_move(c, piece)
+        if self.__cpp_engine is not None:
+            self.__sync_engine()
 
     def get_last_move(self):
         return self.__last_move
@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from statistics import median
+
+
+class SearchScheduler:
+    """
+    Shares the host's CPU between the engine searches of many game sessions.
+    Tracks in-flight searches and how much slower searches run when they overlap with others
+    than the same depth runs alone; while either exceeds its budget, requests are granted
+    a shallower depth (less so for higher priorities). Full depth returns as soon as the load subsides.
+    """
+
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+    def __init__(self, max_in_flight=4, slowdown_budget=3.0, percentile=0.95, window_seconds=10.0,
+                 depth_step=2, min_depth=1, idle_samples=20, clock=time.monotonic):
+        """
+        :param max_in_flight: Number of concurrent searches the host handles without degrading.
+        :param slowdown_budget: Allowed ratio between the latency of overlapping searches and the
+                                idle latency of the same depth (0 disables the latency check).
+        :param percentile: Slowdown percentile compared to the budget (0.95 = p95).
+        :param window_seconds: Only searches finished within this window count towards the percentile.
+        :param depth_step: Plies removed per level of overload.
+        :param min_depth: Depth never goes below this value.
+        :param idle_samples: Number of recent searches that ran alone kept per depth as its idle baseline.
+        :param clock: Time source (seconds), replaceable for tests.
+        """
+        self.__max_in_flight = max_in_flight
+        self.__slowdown_budget = slowdown_budget
+        self.__percentile = percentile
+        self.__window_seconds = window_seconds
+        self.__depth_step = depth_step
+        self.__min_depth = min_depth
+        self.__idle_samples = idle_samples
+        self.__clock = clock
+
+        self.__lock = threading.Lock()
+        self.__in_flight = 0
+        # Bumped whenever a search starts while another one is running. A search ran alone
+        # if it started on an idle host and the epoch did not change until it finished.
+        self.__epoch = 0
+        self.__alone_epoch = 0
+        self.__idle_latencies = {}  # depth -> deque of seconds (searches that ran alone)
+        self.__slowdowns = deque()  # (finish time, latency / idle latency of that depth)
+        self.__metrics = {
+            'searches': 0,
+            'degraded_moves': 0,
+            'plies_removed': 0,
+            'degraded_by_priority': {self.LOW: 0, self.NORMAL: 0, self.HIGH: 0},
+            'peak_in_flight': 0,
+        }
+
+    def acquire(self, depth, priority=NORMAL):
+        """
+        Registers a new search and decides how deep it may go.
+        Every acquire must be followed by a release of the granted depth.
+
+        :param depth: The depth the difficulty level asks for.
+        :param priority: LOW, NORMAL or HIGH.
+        :return: The granted depth (<= depth).
+        """
+        with self.__lock:
+            levels = self.__overload_levels()
+            if levels > 0:
+                # Under load, LOW gives up one extra level and HIGH one level less
+                levels += self.NORMAL - priority
+            granted = depth
+            if levels > 0:
+                granted = max(min(self.__min_depth, depth), depth - levels * self.__depth_step)
+
+            if self.__in_flight == 0:
+                self.__alone_epoch = self.__epoch
+            else:
+                self.__epoch += 1
+            self.__in_flight += 1
+            self.__metrics['searches'] += 1
+            self.__metrics['peak_in_flight'] = max(self.__metrics['peak_in_flight'], self.__in_flight)
+            if granted < depth:
+                self.__metrics['degraded_moves'] += 1
+                self.__metrics['plies_removed'] += depth - granted
+                self.__metrics['degraded_by_priority'][priority] += 1
+            return granted
+
+    def release(self, depth, elapsed):
+        """
+        Marks a search as finished.
+
+        :param depth: The depth that was searched (the granted depth).
+        :param elapsed: Duration of the search in seconds.
+        """
+        with self.__lock:
+            alone = self.__in_flight == 1 and self.__epoch == self.__alone_epoch
+            self.__in_flight -= 1
+            idle = self.__idle_latencies.setdefault(depth, deque(maxlen=self.__idle_samples))
+            if alone:
+                idle.append(elapsed)
+            elif idle:
+                self.__slowdowns.append((self.__clock(), elapsed / median(idle)))
+
+    @contextmanager
+    def search(self, depth, priority=NORMAL):
+        """
+        Context manager around acquire/release that times the search.
+
+        :return: The granted depth.
+        """
+        granted = self.acquire(depth, priority)
+        start = time.perf_counter()
+        try:
+            yield granted
+        finally:
+            self.release(granted, time.perf_counter() - start)
+
+    def get_slowdown_percentile(self):
+        """
+        :return: The rolling slowdown percentile of overlapping searches, or 0.0 when none finished recently.
+        """
+        with self.__lock:
+            return self.__rolling_percentile()
+
+    def get_metrics(self):
+        """
+        :return: A snapshot of the counters plus the current load.
+        """
+        with self.__lock:
+            metrics = dict(self.__metrics)
+            metrics['degraded_by_priority'] = dict(self.__metrics['degraded_by_priority'])
+            metrics['in_flight'] = self.__in_flight
+            metrics['slowdown_percentile'] = self.__rolling_percentile()
+            metrics['idle_latency'] = {depth: median(samples)
+                                       for depth, samples in self.__idle_latencies.items() if samples}
+            return metrics
+
+    def __overload_levels(self):
+        """
+        How far the host is over budget: 0 when within budget, then one level per
+        multiple of the worse of the two budgets (in-flight searches, slowdown percentile).
+        Called with the lock held.
+        """
+        pressure = self.__in_flight / self.__max_in_flight
+        if self.__slowdown_budget > 0:
+            pressure = max(pressure, self.__rolling_percentile() / self.__slowdown_budget)
+        if pressure < 1:
+            return 0
+        return int(pressure)
+
+    def __rolling_percentile(self):
+        """
+        Drops samples older than the window and returns the percentile of the rest.
+        Called with the lock held.
+        """
+        cutoff = self.__clock() - self.__window_seconds
+        while self.__slowdowns and self.__slowdowns[0][0] < cutoff:
+            self.__slowdowns.popleft()
+        if not self.__slowdowns:
+            return 0.0
+        samples = sorted(slowdown for _, slowdown in self.__slowdowns)
+        return samples[min(len(samples) - 1, int(self.__percentile * len(samples)))]
@@ -0,0 +1,176 @@
+import argparse
+import mmap
+import os
+import struct
+from random import Random
+
+from domain.board import Board
+
+# File layout: 24-byte header, block index, data section (see connect4_core.cpp).
+# The `count` sorted records, each (position_key << 8) | result, are split into blocks of
+# `block_records`; the index holds each block's first record and data offset (two uint64),
+# the data section the varint-encoded differences between the other records of each block.
+# Lookups binary-search the index and decode one block in place, so the file stays memory-mappable.
+MAGIC = b'C4TB'
+VERSION = 2
+HEADER = struct.Struct('<4sHHQQ')
+INDEX_ENTRY = 16
+BLOCK_RECORDS = 32
+
+# Default location, next to start.py
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tablebase.bin')
+
+
+class Tablebase:
+    """
+    Read-only, memory-mapped endgame tablebase.
+    The records are handed to Connect4Core, which probes them during the search.
+    """
+
+    def __init__(self, path):
+        """
+        Opens and validates a tablebase file.
+
+        :param path: Path of a file written by build_tablebase.
+        :raises ValueError: If the file is not a tablebase or has an unsupported version.
+        """
+        with open(path, 'rb') as file:
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.__mmap) < HEADER.size:
+            self.__mmap.close()
+            raise ValueError(f'{path} is not a Connect4 tablebase.')
+        magic, version, max_empty, count, block_records = HEADER.unpack_from(self.__mmap)
+        blocks = -(-count // block_records) if block_records else 0
+        if (magic != MAGIC or version != VERSION or block_records == 0
+                or len(self.__mmap) < HEADER.size + blocks * INDEX_ENTRY):
+            self.__mmap.close()
+            raise ValueError(f'{path} is not a version {VERSION} Connect4 tablebase.')
+
+        self.__max_empty = max_empty
+        self.__count = count
+        self.__block_records = block_records
+        self.__records = memoryview(self.__mmap)[HEADER.size:]
+
+    def attach(self, engine):
+        """
+        Makes a Connect4Core instance consult this tablebase before searching.
+
+        :param engine: The C++ engine to attach to.
+        """
+        engine.set_tablebase(self.__records, self.__count, self.__block_records, self.__max_empty)
+
+    def get_max_empty(self):
+        return self.__max_empty
+
+    def __len__(self):
+        return self.__count
+
+    def close(self):
+        """
+        Unmaps the file.
+
+        :raises BufferError: If an engine is still attached (clear_tablebase or discard it first).
+        """
+        self.__records.release()
+        self.__mmap.close()
+
+
+def load_default_tablebase():
+    """
+    Opens the tablebase at DEFAULT_PATH if one has been built.
+
+    :return: A Tablebase, or None if the file does not exist or is invalid.
+    """
+    if not os.path.exists(DEFAULT_PATH):
+        return None
+    try:
+        return Tablebase(DEFAULT_PATH)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not load tablebase: {e}")
+        return None
+
+
+def self_play_roots(count, max_empty, depth=5, opening_moves=4, seed=0):
+    """
+    Generates root positions from engine self-play (PLAYER moves first), so the table covers
+    the endgames that engine-played games actually reach. Each game opens with a few random
+    moves for variety, then both sides play get_best_move at the given depth.
+    Every root has exactly max_empty empty cells and no winner yet; duplicates are skipped.
+
+    :param count: Number of roots to generate.
+    :param max_empty: Number of empty cells left in every root.
+    :param depth: Search depth of both sides (5 = hard).
+    :param opening_moves: Random moves played before the engine takes over.
+    :param seed: Seed for reproducible tablebases.
+    :return: A list of move sequences (column indices).
+    """
+    from services.engine_loader import engine_loader
+
+    connect4_core = engine_loader.get() or engine_loader.wait()
+    rng = Random(seed)
+    roots = []
+    seen = set()
+    attempts = 0
+    while len(roots) < count and attempts < count * 20:
+        attempts += 1
+        core = connect4_core.Connect4Core()
+        moves = []
+        piece = Board.PLAYER
+        while 42 - len(moves) > max_empty:
+            if len(moves) < opening_moves:
+                col = rng.randrange(7)
+            else:
+                score, col = core.get_best_move(depth, piece)
+            row = core.make_move(col, piece)
+            moves.append(col)
+            if core.check_winner(piece, row, col):
+                break
+            piece = -piece
+        else:
+            if tuple(moves) not in seen:
+                seen.add(tuple(moves))
+                roots.append(moves)
+    return roots
+
+
+def build_tablebase(roots, max_empty, path):
+    """
+    Solves every position reachable from the given roots and writes the tablebase file.
+    Exhaustive enumeration from the empty board is out of reach (trillions of positions),
+    so coverage is the union of the roots' subtrees.
+
+    :param roots: Move sequences (column indices, PLAYER first) with at most max_empty empty cells left.
+    :param max_empty: Largest number of empty cells stored in the table.
+    :param path: Output file.
+    :return: The number of positions written.
+    :raises ValueError: If a root has more than max_empty empty cells or already has a winner.
+    """
+    from services.engine_loader import engine_loader, play_moves
+
+    connect4_core = engine_loader.get() or engine_loader.wait()
+    builder = connect4_core.TablebaseBuilder()
+    for moves in roots:
+        core = connect4_core.Connect4Core()
+        piece = play_moves(core, moves)
+        builder.add_root(core, piece, max_empty)
+
+    encoded = builder.encode(BLOCK_RECORDS)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, max_empty, builder.size(), BLOCK_RECORDS))
+        file.write(encoded)
+    return builder.size()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the Connect4 endgame tablebase.")
+    parser.add_argument('--max-empty', type=int, default=12, help="empty cells left in each root position")
+    parser.add_argument('--roots', type=int, default=500, help="number of self-play root positions")
+    parser.add_argument('--depth', type=int, default=5, help="self-play search depth")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    roots = self_play_roots(args.roots, args.max_empty, args.depth, seed=args.seed)
+    written = build_tablebase(roots, args.max_empty, args.out)
+    print(f"Wrote {written} positions to {args.out}")
@@ -1,7 +1,24 @@
+import os
+import sys
+import tempfile
+import types
+from random import Random
 from unittest import TestCase
+from unittest.mock import patch
+from services.engine_loader import ENGINE_VERSION, EngineLoader, play_moves
 from services.game import Game
+from services.search_scheduler import SearchScheduler
+from services.threats import ThreatTracker
+from services.tablebase import Tablebase, build_tablebase, self_play_roots
 from domain.board import Board
 
+
+class UnavailableLoader:
+    """Engine loader stand-in for a C++ engine that is still being installed."""
+    def get(self):
+        return None
+
+
 class ServicesTest(TestCase):
     def setUp(self):
         # Initialize with 'hard' to load the C++ engine by default
@@ -148,4 +165,307 @@ class ServicesTest(TestCase):
         # Just assert that the piece count increased
         board = self.__game.get_board()
         piece_count = sum(row.count(Board.COMPUTER) for row in board)
-        self.assertEqual(piece_count, 1, "Impossible AI did not make a move")
\ No newline at end of file
+        self.assertEqual(piece_count, 1, "Impossible AI did not make a move")
+
+    def test_engine_loaded_lazily(self):
+        """Test that the C++ engine is only created on the first AI move that needs it."""
+        self.__game.make_move(3)
+        self.assertFalse(self.__game.is_engine_ready())
+
+        self.__game.computer_move()
+        self.assertTrue(self.__game.is_engine_ready())
+
+    def test_ai_hard_fallback_while_engine_loading(self):
+        """Test Hard AI plays the medium strategy (block) while the engine is unavailable."""
+        game = Game(difficulty='hard', loader=UnavailableLoader())
+
+        # R R R _
+        game.make_move(0) # Red
+        game.make_move(6) # Yellow (waste)
+        game.make_move(1) # Red
+        game.make_move(6) # Yellow (waste)
+        game.make_move(2) # Red
+
+        game.computer_move()
+
+        board = game.get_board()
+        self.assertFalse(game.is_engine_ready())
+        self.assertTrue(any(board[r][3] == Board.COMPUTER for r in range(6)))
+
+    def test_outdated_engine_reinstalled(self):
+        """Test that an installed engine with an old version is reinstalled instead of imported."""
+        installs = []
+        loader = EngineLoader(installer=lambda: installs.append(True) or True)
+        with patch('services.engine_loader.installed_engine_version', return_value='0.0.0'):
+            game = Game(difficulty='hard', loader=loader)
+            game.make_move(3)
+            # Medium strategy while the update installs, no AttributeError from the old engine
+            game.computer_move()
+            self.assertFalse(game.is_engine_ready())
+            module = loader.wait()
+
+        self.assertEqual(installs, [True])
+        self.assertEqual(loader.get_status(), EngineLoader.READY)
+        self.assertEqual(module.__version__, ENGINE_VERSION)
+
+    def test_outdated_engine_module_not_used(self):
+        """Test that an importable engine without the current API is never handed to a game."""
+        stale = types.ModuleType('connect4_core')  # built before __version__ existed
+        loader = EngineLoader(installer=lambda: True)
+        with patch('services.engine_loader.installed_engine_version', return_value=None), \
+                patch.dict(sys.modules, {'connect4_core': stale}):
+            game = Game(difficulty='impossible', loader=loader)
+            game.make_move(3)
+            game.computer_move()
+            self.assertIsNone(loader.wait())
+
+        self.assertFalse(game.is_engine_ready())
+        self.assertEqual(loader.get_status(), EngineLoader.FAILED)
+
+    def test_tablebase_matches_full_search(self):
+        """Test that tablebase results agree with a full-depth C++ search."""
+        import connect4_core
+
+        roots = self_play_roots(5, 8, seed=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tablebase.bin')
+            written = build_tablebase(roots, 8, path)
+            tablebase = Tablebase(path)
+            self.assertEqual(len(tablebase), written)
+
+            searcher = connect4_core.Connect4Core()
+            prober = connect4_core.Connect4Core()
+            tablebase.attach(prober)
+            for moves in roots:
+                piece = play_moves(searcher, moves)
+                play_moves(prober, moves)
+
+                found, result = prober.lookup_tablebase(piece)
+                score, col = searcher.get_best_move(8, piece)
+                self.assertEqual(found, 1)
+                self.assertEqual(result > 0, score >= 900000)
+                self.assertEqual(result < 0, score <= -900000)
+
+                # Children of the root are stored too (spread over many compressed blocks),
+                # unless the root is won in one ply and the solver never needed them
+                for col in range(7 if abs(result) != 1 else 0):
+                    child = connect4_core.Connect4Core()
+                    play_moves(child, moves)
+                    row = child.make_move(col, piece)
+                    if row < 0 or child.check_winner(piece, row, col):
+                        continue
+                    tablebase.attach(child)
+                    found, result = child.lookup_tablebase(-piece)
+                    score, _ = child.get_best_move(8, -piece)
+                    child.clear_tablebase()
+                    self.assertEqual(found, 1)
+                    self.assertEqual(result > 0, score >= 900000)
+                    self.assertEqual(result < 0, score <= -900000)
+                searcher.reset()
+                prober.reset()
+
+            # A position outside the table is not found
+            prober.make_move(3, Board.PLAYER)
+            self.assertEqual(prober.lookup_tablebase(Board.COMPUTER), (0, 0))
+            prober.reset()
+            # Delta-encoded blocks take less space than one uint64 per record
+            self.assertLess(os.path.getsize(path), written * 8)
+
+            # An attached engine keeps the records mapped
+            with self.assertRaises(BufferError):
+                tablebase.close()
+            prober.clear_tablebase()
+            tablebase.close()
+
+    def test_tablebase_rejects_won_root(self):
+        """Test that a root that is already won cannot be stored."""
+        # Red wins vertically in column 0
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                build_tablebase([[0, 1, 0, 1, 0, 1, 0]], 42, os.path.join(tmp, 'tablebase.bin'))
+
+    def test_ai_endgame_solved_exactly(self):
+        """Test that the solver's endgame move keeps the result of a full-depth search."""
+        import connect4_core
+
+        for moves in self_play_roots(5, Game.ENDGAME_EMPTY, opening_moves=2, seed=3):
+            exact = connect4_core.Connect4Core()
+            exact.set_endgame_solver(Game.ENDGAME_EMPTY)
+            piece = play_moves(exact, moves)
+            full = connect4_core.Connect4Core()
+            play_moves(full, moves)
+
+            score, col = exact.get_best_move(5, piece)
+            full_score, _ = full.get_best_move(Game.ENDGAME_EMPTY, piece)
+            self.assertEqual(score >= 900000, full_score >= 900000)
+            self.assertEqual(score <= -900000, full_score <= -900000)
+
+            # The chosen move is optimal: the position after it has the same result
+            row = full.make_move(col, piece)
+            if full.check_winner(piece, row, col):
+                self.assertEqual(score >= 900000, piece == Board.COMPUTER)
+                self.assertEqual(score <= -900000, piece == Board.PLAYER)
+                continue
+            child_score, _ = full.get_best_move(Game.ENDGAME_EMPTY - 1, -piece)
+            self.assertEqual(child_score >= 900000, score >= 900000)
+            self.assertEqual(child_score <= -900000, score <= -900000)
+
+    def test_ai_impossible_solves_endgame(self):
+        """Test that impossible finds an endgame win beyond its depth, and hard keeps its depth-limited move."""
+        # Computer to move with 13 empty cells: column 1 wins in 11 plies, depth 5 and 9 both play column 4
+        moves = [3, 0, 0, 3, 0, 2, 0, 0, 2, 2, 4, 5, 2, 4, 3, 3, 0, 1, 1, 1, 1, 1, 2, 2, 5, 5, 5, 5, 5]
+        for level, expected in (('hard', 4), ('impossible', 1)):
+            game = Game(difficulty=level)
+            for col in moves:
+                game.make_move(col)
+            game.computer_move()
+            self.assertEqual(game.get_last_move()[1], expected)
+
+        # The level is read on every move, so switching mid-game enables the solver
+        game = Game(difficulty='hard')
+        game.load_engine()
+        for col in moves:
+            game.make_move(col)
+        game.set_difficulty('impossible')
+        game.computer_move()
+        self.assertEqual(game.get_last_move()[1], 1)
+
+    def test_scheduler_degrades_under_load_and_restores(self):
+        """Test that concurrent searches lower the depth by priority and full depth returns afterwards."""
+        scheduler = SearchScheduler(max_in_flight=2, slowdown_budget=0)
+
+        self.assertEqual(scheduler.acquire(9), 9)
+        self.assertEqual(scheduler.acquire(9), 9)
+        # Two searches in flight: the budget is reached
+        self.assertEqual(scheduler.acquire(9, SearchScheduler.HIGH), 9)
+        self.assertEqual(scheduler.acquire(9, SearchScheduler.NORMAL), 7)
+        self.assertEqual(scheduler.acquire(9, SearchScheduler.LOW), 3)
+
+        for depth in [9, 9, 9, 7, 3]:
+            scheduler.release(depth, 0.1)
+        self.assertEqual(scheduler.acquire(9, SearchScheduler.LOW), 9)
+
+        metrics = scheduler.get_metrics()
+        self.assertEqual(metrics['searches'], 6)
+        self.assertEqual(metrics['degraded_moves'], 2)
+        self.assertEqual(metrics['degraded_by_priority'][SearchScheduler.LOW], 1)
+        self.assertEqual(metrics['peak_in_flight'], 5)
+
+    def test_scheduler_idle_deep_searches_not_degraded(self):
+        """Test that slow searches running alone (an idle impossible game) never degrade later moves."""
+        now = [0.0]
+        scheduler = SearchScheduler(clock=lambda: now[0])
+
+        for elapsed in [0.75, 0.58, 1.2, 0.62, 2.5, 0.7]:
+            self.assertEqual(scheduler.acquire(9), 9)
+            now[0] += elapsed
+            scheduler.release(9, elapsed)
+        # A hard game sharing the scheduler afterwards
+        self.assertEqual(scheduler.acquire(5), 5)
+
+        metrics = scheduler.get_metrics()
+        self.assertEqual(metrics['degraded_moves'], 0)
+        self.assertEqual(metrics['slowdown_percentile'], 0.0)
+
+    def test_scheduler_slowdown_window(self):
+        """Test that overlapping searches much slower than idle degrade new requests until they leave the window."""
+        now = [0.0]
+        scheduler = SearchScheduler(slowdown_budget=3.0, window_seconds=10, clock=lambda: now[0])
+
+        # Idle baseline for depth 5: 0.1 s
+        scheduler.acquire(5)
+        scheduler.release(5, 0.1)
+
+        # Two overlapping searches, 5x slower than idle
+        scheduler.acquire(5)
+        scheduler.acquire(5)
+        scheduler.release(5, 0.5)
+        scheduler.release(5, 0.5)
+        self.assertEqual(scheduler.get_slowdown_percentile(), 5.0)
+        self.assertEqual(scheduler.acquire(5), 3)
+        scheduler.release(3, 0.05)
+
+        now[0] = 11.0
+        self.assertEqual(scheduler.acquire(5), 5)
+
+    def test_game_uses_scheduler(self):
+        """Test that engine moves go through the scheduler."""
+        scheduler = SearchScheduler()
+        game = Game(difficulty='hard', scheduler=scheduler)
+        game.make_move(3)
+        game.computer_move()
+
+        metrics = scheduler.get_metrics()
+        self.assertEqual(metrics['searches'], 1)
+        self.assertEqual(metrics['in_flight'], 0)
+
+    def test_persistent_engine_matches_fresh_search(self):
+        """Test that an engine reused across moves (as Game does) searches exactly like a fresh one."""
+        import connect4_core
+
+        moves = [3, 3, 2, 4, 4, 2, 5, 1]
+        persistent = connect4_core.Connect4Core()
+        piece = Board.PLAYER
+        for i, col in enumerate(moves):
+            persistent.make_move(col, piece)
+            piece = -piece
+
+            fresh = connect4_core.Connect4Core()
+            play_moves(fresh, moves[:i + 1])
+
+            self.assertEqual(persistent.get_best_move(5, piece), fresh.get_best_move(5, piece))
+            self.assertEqual(persistent.nodes, fresh.nodes)
+
+    def test_ai_medium_win(self):
+        """Test Medium AI takes its own win before blocking."""
+        self.__game.set_difficulty('medium')
+
+        # Yellow has 3 stacked in col 6, Red has 3 in the bottom row
+        self.__game.make_move(0) # Red
+        self.__game.make_move(6) # Yellow
+        self.__game.make_move(1) # Red
+        self.__game.make_move(6) # Yellow
+        self.__game.make_move(2) # Red
+        self.__game.make_move(6) # Yellow
+        self.__game.make_move(5) # Red
+
+        self.assertTrue(self.__game.computer_move())
+        self.assertEqual(self.__game.get_last_move(), (2, 6))
+
+    def test_threat_tracker_matches_brute_force(self):
+        """Test that threat lookups agree with placing each piece and checking for a win."""
+        rng = Random(7)
+        for _ in range(50):
+            game = Game(difficulty='easy')
+            tracker = ThreatTracker()
+            board = game.get_board()
+            piece = Board.PLAYER
+            while not game.is_full():
+                for side in (Board.PLAYER, Board.COMPUTER):
+                    expected = None
+                    for col in range(7):
+                        row = next((r for r in range(5, -1, -1) if board[r][col] == Board.EMPTY), None)
+                        if row is None:
+                            continue
+                        board[row][col] = side
+                        won = game.check_winner(side, row, col)
+                        board[row][col] = Board.EMPTY
+                        if won:
+                            expected = col
+                            break
+                    self.assertEqual(tracker.winning_column(side), expected)
+
+                col = rng.choice([c for c in range(7) if board[0][c] == Board.EMPTY])
+                row = next(r for r in range(5, -1, -1) if board[r][col] == Board.EMPTY)
+                board[row][col] = piece
+                if tracker.add(row, col, piece) != game.check_winner(piece, row, col):
+                    self.fail("ThreatTracker win detection disagrees with check_winner")
+                if game.check_winner(piece, row, col):
+                    break
+                piece = -piece
+
+            rebuilt = ThreatTracker()
+            rebuilt.rebuild(board)
+            for side in (Board.PLAYER, Board.COMPUTER):
+                self.assertEqual(rebuilt.get_threats(side), tracker.get_threats(side))
+                self.assertEqual(rebuilt.winning_column(side), tracker.winning_column(side))
@@ -0,0 +1,142 @@
+from domain.board import Board
+
+ROWS = 6
+COLS = 7
+
+
+def _build_windows():
+    """
+    :return: Every four-in-a-row window as a tuple of cell indices (row * COLS + col).
+    """
+    windows = []
+    for r in range(ROWS):
+        for c in range(COLS):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                if 0 <= r + 3 * dr < ROWS and 0 <= c + 3 * dc < COLS:
+                    windows.append(tuple((r + i * dr) * COLS + c + i * dc for i in range(4)))
+    return windows
+
+
+WINDOWS = _build_windows()
+
+# For each cell, the indices of the windows through it
+CELL_WINDOWS = [[w for w, window in enumerate(WINDOWS) if cell in window] for cell in range(ROWS * COLS)]
+
+
+class ThreatTracker:
+    """
+    Keeps per-window piece counts up to date as moves are made, and from them the threats:
+    empty cells that would complete a four-in-a-row for a piece.
+    Finding a winning or blocking move is then a set lookup per column.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the tracker (empty board).
+        """
+        self.__cells = [Board.EMPTY] * (ROWS * COLS)
+        # Next free row per column (like Board), -1 when the column is full
+        self.__next_row = [ROWS - 1] * COLS
+        self.__counts = {Board.PLAYER: [0] * len(WINDOWS), Board.COMPUTER: [0] * len(WINDOWS)}
+        # Number of windows making each cell a threat, and the cells where that number is > 0
+        self.__support = {Board.PLAYER: [0] * (ROWS * COLS), Board.COMPUTER: [0] * (ROWS * COLS)}
+        self.__threats = {Board.PLAYER: set(), Board.COMPUTER: set()}
+
+    def add(self, row, col, piece):
+        """
+        Records a piece placed at (row, col).
+
+        :return: True if the piece completed a four-in-a-row, False otherwise.
+        """
+        cell = row * COLS + col
+        own_counts = self.__counts[piece]
+        opp_counts = self.__counts[-piece]
+        won = False
+
+        self.__cells[cell] = piece
+        self.__next_row[col] = row - 1
+        for w in CELL_WINDOWS[cell]:
+            own = own_counts[w]
+            opp = opp_counts[w]
+            if opp == 3 and own == 0:
+                # This cell was the opponent's threat through w; w is dead now
+                self.__drop_support(-piece, cell)
+            elif opp == 0:
+                if own == 3:
+                    self.__drop_support(piece, cell)
+                    won = True
+                elif own == 2:
+                    # Third piece: the remaining empty cell of w becomes a threat
+                    for other in WINDOWS[w]:
+                        if self.__cells[other] == Board.EMPTY:
+                            self.__add_support(piece, other)
+            own_counts[w] = own + 1
+        return won
+
+    def rebuild(self, board):
+        """
+        Recomputes everything from a 6x7 board (used when the board is replaced).
+        Only counts pieces per window; the threats are derived once at the end
+        instead of being updated after every piece as add() does.
+        """
+        self.reset()
+        cells = self.__cells
+        next_row = self.__next_row
+        counts = self.__counts
+        triples = []  # windows that reached three pieces of one side
+        for r, board_row in enumerate(board):
+            for c, piece in enumerate(board_row):
+                if piece == Board.EMPTY:
+                    continue
+                cell = r * COLS + c
+                cells[cell] = piece
+                if r <= next_row[c]:
+                    next_row[c] = r - 1
+                own_counts = counts[piece]
+                for w in CELL_WINDOWS[cell]:
+                    own_counts[w] += 1
+                    if own_counts[w] == 3:
+                        triples.append((w, piece))
+
+        for w, piece in triples:
+            # Three pieces and no opponent piece: the fourth cell is empty and a threat
+            if counts[piece][w] == 3 and counts[-piece][w] == 0:
+                for cell in WINDOWS[w]:
+                    if cells[cell] == Board.EMPTY:
+                        self.__add_support(piece, cell)
+                        break
+
+    def winning_column(self, piece):
+        """
+        Finds the first column (left to right) where piece wins by dropping its next piece.
+
+        :return: The column index, or None if there is none.
+        """
+        threats = self.__threats[piece]
+        if not threats:
+            return None
+        for col in range(COLS):
+            row = self.__next_row[col]
+            if row >= 0 and row * COLS + col in threats:
+                return col
+        return None
+
+    def get_threats(self, piece):
+        """
+        :return: The set of (row, col) cells that would complete a four-in-a-row for piece.
+        """
+        return {divmod(cell, COLS) for cell in self.__threats[piece]}
+
+    def __add_support(self, piece, cell):
+        support = self.__support[piece]
+        support[cell] += 1
+        self.__threats[piece].add(cell)
+
+    def __drop_support(self, piece, cell):
+        support = self.__support[piece]
+        support[cell] -= 1
+        if support[cell] == 0:
+            self.__threats[piece].discard(cell)
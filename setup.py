@@ -1,16 +1,25 @@
+import sys
 from setuptools import setup, Extension
 import pybind11
 
+# Keep in sync with ENGINE_VERSION in services/engine_loader.py
+VERSION = "1.0.0"
+
 ext_modules = [
     Extension(
         "connect4_core",
         ["services/connect4_core.cpp"],
         include_dirs=[pybind11.get_include()],
+        define_macros=[("CONNECT4_CORE_VERSION", f'"{VERSION}"')],
+        # pybind11 declares its types hidden; Connect4Core holds a py::buffer_info (the attached
+        # tablebase export), so it must be hidden as well or g++ warns with -Wattributes
+        extra_compile_args=[] if sys.platform == 'win32' else ['-fvisibility=hidden'],
         language='c++'
     ),
 ]
 
 setup(
     name="connect4_core",
+    version=VERSION,
     ext_modules=ext_modules,
 )
\ No newline at end of file
@@ -1,72 +1,46 @@
 import sys
-import subprocess
-import importlib.util
-import os
+import time
 
+# Startup timing starts before any game module is imported
+_START = time.perf_counter()
 
-# Function to check and install the C++ engine if not present
-def ensure_cpp_engine_installed():
+
+class StartupTimer:
     """
-    Checks if connect4_core is installed.
-    1. If it is an .exe (frozen), skips installation.
-    2. Tries to install a pre-compiled wheel from the 'wheels' folder (Fast/Windows).
-    3. If that fails, attempts to compile from source (Mac/Linux).
+    Records named checkpoints since launch and prints a time-to-first-frame report.
+    Enabled with the --startup-report command line flag.
     """
 
-    if getattr(sys, 'frozen', False):
-        # If we are an .exe, PyInstaller has already bundled the C++ engine.
-        # We do NOT want to try running pip.
-        print("Running in Frozen (EXE) mode. Skipping installation checks.")
-        return
-
-    if importlib.util.find_spec("connect4_core") is not None:
-        return  # Already installed!
-
-    print("C++ Engine for Connect4 not found...")
-
-    # Define path to the 'wheels' folder relative to this script
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    wheel_dir = os.path.join(base_dir, 'wheels')
-
-    # --- ATTEMPT 1: Install Pre-Compiled Wheel (Priority) ---
-    try:
-        if os.path.exists(wheel_dir):
-            print("Attempting to install pre-compiled wheel...")
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install",
-                "connect4_core",
-                "--no-index",
-                "--force-reinstall",
-                f"--find-links={wheel_dir}"
-            ])
-            print("Installation complete! Launching game...")
-            return
-        else:
-            print(f"Warning: 'wheels' folder not found at: {wheel_dir}")
-
-    except subprocess.CalledProcessError:
-        print("Pre-compiled wheel not compatible or not found for this OS.")
+    def __init__(self, start):
+        self.__start = start
+        self.__marks = []
 
-    # --- ATTEMPT 2: Compile from Source (Fallback) ---
-    print("Attempting to compile from source (This may take a moment)...")
+    def mark(self, label):
+        self.__marks.append((label, time.perf_counter() - self.__start))
 
-    try:
-        subprocess.check_call([
-            sys.executable, "-m", "pip", "install", "."
-        ])
-        print("Engine compiled and installed successfully! Launching game...")
+    def report(self):
+        print("Startup timing report:")
+        previous = 0.0
+        for label, elapsed in self.__marks:
+            print(f"  {label:<24}{elapsed * 1000:9.1f} ms  (+{(elapsed - previous) * 1000:.1f} ms)")
+            previous = elapsed
 
-    except subprocess.CalledProcessError:
-        print("\nCRITICAL ERROR: Could not install the C++ engine.")
-        print("1. If you are on Windows, ensure the 'wheels' folder is present.")
-        print("2. If you are on Mac/Linux, ensure you have a C++ compiler installed (Xcode/g++).")
-        sys.exit(1)
-
-
-ensure_cpp_engine_installed()
 
 if __name__ == "__main__":
+    timer = StartupTimer(_START)
     from ui.Gui import Gui
+    timer.mark("imports")
 
     gui = Gui()
+    timer.mark("window created")
+
+    if "--startup-report" in sys.argv:
+        # The C++ engine is imported on the first AI move, so it never appears here
+        def first_frame():
+            gui.root.update_idletasks()
+            timer.mark("first frame")
+            timer.report()
+
+        gui.root.after_idle(first_frame)
+
     gui.start()
@@ -3,6 +3,8 @@ from tkinter import messagebox
 from services.game import Game
 from exceptions import InvalidMove
 from domain.board import Board
+from services.engine_loader import EngineLoader, engine_loader
+from services.tablebase import load_default_tablebase
 import sys
 import os
 
@@ -55,6 +57,8 @@ class Gui:
         self.difficulty_var = tk.StringVar(value="hard")
         self.__game = None
         self.__ghost = None
+        # Endgame tablebase (if built) is memory-mapped once and shared by every game
+        self.__tablebase = load_default_tablebase()
 
         self.start_new_game()
         self.create_menu()
@@ -104,7 +108,7 @@ class Gui:
     def start_new_game(self):
         """Starts a new game with the selected difficulty."""
         current_diff = self.difficulty_var.get()
-        self.__game = Game(difficulty=current_diff)
+        self.__game = Game(difficulty=current_diff, tablebase=self.__tablebase)
         if hasattr(self, 'canvas'):
             self.draw_board()
 
@@ -174,6 +178,7 @@ class Gui:
         try:
             win = self.__game.computer_move()
             self.draw_board()
+            self.__update_title()
 
             if win:
                 self.game_over("Computer won!")
@@ -182,6 +187,15 @@ class Gui:
         except InvalidMove as er:
             print(f"Computer Error: {er}")
 
+    def __update_title(self):
+        """Shows in the title bar when hard/impossible play the fallback strategy (engine loading or unavailable)."""
+        if self.difficulty_var.get() not in ["hard", "impossible"] or self.__game.is_engine_ready():
+            self.root.title("Connect Four")
+        elif engine_loader.get_status() == EngineLoader.FAILED:
+            self.root.title("Connect Four (AI engine unavailable, playing medium)")
+        else:
+            self.root.title("Connect Four (AI engine loading...)")
+
     def __handle_hover(self, event):
         """Calculates where the piece would drop and draws a ghost piece."""
         col = event.x // self.cell_size